@@ -1,14 +1,15 @@
 """API routes for label verification."""
 
-import os
-import uuid
-import tempfile
+import asyncio
 import logging
 from pathlib import Path
 
 logger = logging.getLogger("ttb.routes")
 from PIL import Image
+from cachetools import LRUCache
 from fastapi import APIRouter, File, Form, UploadFile, HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
 from app.models.schemas import (
     LabelVerificationResponse,
     ImageResult,
@@ -18,71 +19,164 @@ from app.models.schemas import (
     FieldComparison,
     ComparisonResult,
 )
-from app.services.ocr_service import OCRService
-from app.services.llm_service import LLMService
+from app.services.ocr_service import OCRService, OCRScheduler
+from app.services.llm_service import get_llm_service
 from app.services.image_service import ImageService
 from app.services.normalizer_service import NormalizerService
+from app.utils import content_digest
 
 
 router = APIRouter(prefix="/api", tags=["Label Verification"])
 
 # Initialize services
 ocr_service = OCRService()
-llm_service = LLMService()
+llm_service = get_llm_service()
 image_service = ImageService()
-normalizer_service = NormalizerService()
 
-# Temporary directory for image processing
-TEMP_DIR = Path(tempfile.gettempdir()) / "ttb_label_verification"
+# OCR/vision results keyed by image content hash: (ocr_text, extracted, bboxes)
+RESULT_CACHE: LRUCache = LRUCache(maxsize=256)
 
+# Serializes OCR across requests (LLMService limits Gemini calls)
+ocr_scheduler = OCRScheduler(ocr_service)
 
-def ensure_temp_dir():
-    """Ensure temporary directory exists."""
-    TEMP_DIR.mkdir(parents=True, exist_ok=True)
+# Serializer for the comparison results handed to the LLM explanation
+FIELD_RESULTS_ADAPTER = TypeAdapter(dict[str, FieldComparison])
 
 
-def save_temp_image(image_bytes: bytes, original_filename: str) -> Path:
+def compare_field(
+    field: str, form_value: str | None, label_value: str | None
+) -> FieldComparison:
     """
-    Save image bytes to temporary file.
-    
+    Compare a single form field against the label value.
+
     Args:
-        image_bytes: Image file bytes
-        original_filename: Original filename for extension
-        
+        field: Field name (brand, type, abv, volume)
+        form_value: Value from form input
+        label_value: Value aggregated from the label images
+
     Returns:
-        Path to saved temporary file
+        FieldComparison with normalized values and match flag
     """
-    ensure_temp_dir()
-    
-    # Get file extension from original filename
-    ext = Path(original_filename).suffix or ".jpg"
-    
-    # Generate unique filename
-    unique_filename = f"{uuid.uuid4()}{ext}"
-    temp_path = TEMP_DIR / unique_filename
-    
-    # Write bytes to file
-    with open(temp_path, "wb") as f:
-        f.write(image_bytes)
-    
-    return temp_path
+    match, norm_form, norm_label = NormalizerService.compare_values(
+        field, form_value, label_value
+    )
+    return FieldComparison(
+        match=match,
+        form_value=form_value,
+        label_value=label_value,
+        normalized_form=norm_form,
+        normalized_label=norm_label,
+    )
+
+
+async def extract_images_data(
+    uploads: list[tuple[bytes, str]],
+) -> list[tuple[str, dict, dict]]:
+    """
+    Run OCR and vision extraction for a batch of images and locate field bboxes.
 
+    Large images are downscaled to working copies first; bounding boxes are
+    mapped back to original image coordinates. OCR runs per image in worker
+    threads while all images go to the vision model in a single request.
+
+    Args:
+        uploads: List of (image_bytes, filename) tuples
 
-def delete_temp_file(file_path: Path):
+    Returns:
+        List of (ocr_text, extracted_data, bounding_boxes), one per image
     """
-    Delete temporary file if it exists.
-    
+    # Downscale to working copies (OCR/vision cost scales with pixel count)
+    downscaled = await asyncio.gather(
+        *(asyncio.to_thread(image_service.downscale, image_bytes) for image_bytes, _ in uploads)
+    )
+    work_images = [
+        (work_bytes, filename if scale >= 1.0 else f"{Path(filename).stem}.jpg")
+        for (_, filename), (work_bytes, scale) in zip(uploads, downscaled)
+    ]
+
+    # Step 1 & 2: Run OCR (text positions for bounding boxes) per image and
+    # one batched Vision model extraction (includes validation) concurrently
+    *ocr_outputs, extracted_list = await asyncio.gather(
+        *(ocr_scheduler.submit(work_bytes) for work_bytes, _ in work_images),
+        llm_service.aextract_from_images_bytes(work_images),
+    )
+
+    results = []
+    for (ocr_text, ocr_results), extracted, (_, scale) in zip(
+        ocr_outputs, extracted_list, downscaled
+    ):
+        logger.info(f"OCR text: {ocr_text[:300]}..." if len(ocr_text) > 300 else f"OCR text: {ocr_text}")
+        logger.info(f"Vision extracted: {extracted}")
+
+        # Check validation from extraction result
+        if not extracted.get("is_valid", True):
+            # Build error message
+            if not extracted.get("is_alcohol_label", True):
+                error_msg = "This image does not appear to be an alcohol beverage label. Please upload a valid alcohol label image."
+            elif not extracted.get("quality_ok", True):
+                error_msg = f"Image quality issue: {extracted.get('validation_message', 'Please upload a clearer image.')}"
+            else:
+                error_msg = extracted.get("validation_message", "Invalid image")
+
+            raise HTTPException(status_code=400, detail=error_msg)
+
+        # Step 3: Use OCR results to find bounding boxes for extracted values
+        bboxes = ocr_service.find_field_bboxes(ocr_results, extracted)
+        if scale < 1.0:
+            bboxes = image_service.scale_bounding_boxes(bboxes, 1 / scale)
+        logger.info(f"Bounding boxes: {bboxes}")
+
+        results.append((ocr_text, extracted, bboxes))
+
+    return results
+
+
+async def process_images(images: list[UploadFile]) -> list[tuple[bytes, str, dict, dict]]:
+    """
+    Read uploaded images and extract (or fetch cached) label data for them.
+
+    OCR/vision results are cached by image content hash, so identical images
+    (retries, duplicate uploads) skip the OCR and LLM calls. Images that are
+    not cached are extracted together in one batch.
+
     Args:
-        file_path: Path to file to delete
+        images: Uploaded image files
+
+    Returns:
+        List of (image_bytes, ocr_text, extracted_data, bounding_boxes),
+        one per image
     """
-    try:
-        if file_path.exists():
-            os.remove(file_path)
-    except Exception:
-        pass  # Ignore deletion errors
+    uploads = await asyncio.gather(*(image_file.read() for image_file in images))
+    digests = [content_digest(image_bytes) for image_bytes in uploads]
+    entries = [RESULT_CACHE.get(digest) for digest in digests]
+
+    # Extract each distinct uncached image once
+    pending: dict[str, int] = {}
+    for idx, (digest, entry) in enumerate(zip(digests, entries)):
+        if entry is None:
+            pending.setdefault(digest, idx)
+        else:
+            logger.info(f"Result cache hit: {digest}")
+
+    if pending:
+        extracted_data = await extract_images_data(
+            [(uploads[idx], images[idx].filename or f"image_{idx}.jpg") for idx in pending.values()]
+        )
+        fresh = dict(zip(pending, extracted_data))
+        for digest, data in fresh.items():
+            # Don't cache failed extractions so they are retried
+            if not data[1].get("error"):
+                RESULT_CACHE[digest] = data
+        entries = [entry or fresh[digest] for digest, entry in zip(digests, entries)]
 
+    return [(image_bytes, *entry) for image_bytes, entry in zip(uploads, entries)]
 
-@router.post("/verify-label", response_model=LabelVerificationResponse)
+
+@router.post(
+    "/verify-label",
+    response_model=LabelVerificationResponse,
+    response_class=ORJSONResponse,
+)
 async def verify_label(
     images: list[UploadFile] = File(..., description="Label images to verify"),
     brand: str = Form(..., description="Brand name from form"),
@@ -94,13 +188,12 @@ async def verify_label(
     Verify label images against form data.
 
     This endpoint:
-    1. Saves uploaded images to temporary files
+    1. Reads uploaded images into memory
     2. Uses Gemini Vision to extract label info and validate image
     3. Uses OCR for bounding box detection
     4. Normalizes values for comparison (handles unit conversions)
     5. Compares form data with extracted label data
     6. Returns annotated images with bounding boxes and comparison results
-    7. Deletes temporary files after processing
     """
     if not images:
         raise HTTPException(status_code=400, detail="At least one image is required")
@@ -125,110 +218,70 @@ async def verify_label(
         "volume": None,
     }
     
-    # Track temporary files for cleanup
-    temp_files: list[Path] = []
-
     try:
-        for idx, image_file in enumerate(images):
-            # Read image bytes
-            image_bytes = await image_file.read()
-            
-            # Save to temporary file
-            temp_path = save_temp_image(
-                image_bytes, 
-                image_file.filename or f"image_{idx}.jpg"
-            )
-            temp_files.append(temp_path)
-
-            # Step 1: Run OCR to get text positions for bounding boxes
-            ocr_text, ocr_results = ocr_service.extract_text_from_path(str(temp_path))
-            logger.info(f"OCR text: {ocr_text[:300]}..." if len(ocr_text) > 300 else f"OCR text: {ocr_text}")
-            
-            # Step 2: Use Vision model for extraction (includes validation)
-            extracted = llm_service.extract_from_image_simple(str(temp_path))
-            logger.info(f"Vision extracted: {extracted}")
-            
-            # Check validation from extraction result
-            if not extracted.get("is_valid", True):
-                # Clean up temp files before raising error
-                for temp_file in temp_files:
-                    delete_temp_file(temp_file)
-                
-                # Build error message
-                if not extracted.get("is_alcohol_label", True):
-                    error_msg = "This image does not appear to be an alcohol beverage label. Please upload a valid alcohol label image."
-                elif not extracted.get("quality_ok", True):
-                    error_msg = f"Image quality issue: {extracted.get('validation_message', 'Please upload a clearer image.')}"
-                else:
-                    error_msg = extracted.get("validation_message", "Invalid image")
-                
-                raise HTTPException(status_code=400, detail=error_msg)
-            
-            # Step 3: Use OCR results to find bounding boxes for extracted values
-            bboxes = ocr_service.find_field_bboxes(ocr_results, extracted)
-            logger.info(f"Bounding boxes: {bboxes}")
+        # Extract label data from all images
+        processed = await process_images(images)
 
+        for _, _, extracted, _ in processed:
             # Update aggregated data (use first non-null value found)
             for field in ["brand", "type", "abv", "volume"]:
                 if aggregated_extracted_data[field] is None and extracted.get(field):
                     aggregated_extracted_data[field] = extracted[field]
 
-            # Create BoundingBoxes object
-            bbox_objects = BoundingBoxes(
-                brand=BoundingBox(**bboxes["brand"]) if bboxes.get("brand") else None,
-                type=BoundingBox(**bboxes["type"]) if bboxes.get("type") else None,
-                abv=BoundingBox(**bboxes["abv"]) if bboxes.get("abv") else None,
-                volume=BoundingBox(**bboxes["volume"]) if bboxes.get("volume") else None,
-            )
-
-            # Annotate image with bounding boxes and encode as Base64
-            with open(temp_path, "rb") as f:
-                image_bytes_for_annotation = f.read()
-            annotated_image_base64 = image_service.annotate_and_encode(
-                image_bytes_for_annotation, bboxes
-            )
-
-            # Create result for this image
-            result = ImageResult(
-                image_index=idx,
-                original_filename=image_file.filename or f"image_{idx}",
-                ocr_raw_text=ocr_text,
-                extracted_data=ExtractedData(**extracted),
-                bounding_boxes=bbox_objects,
-                annotated_image_base64=annotated_image_base64,
-            )
-            results.append(result)
-
         # Compare form data with aggregated label data
-        field_results = {}
-        all_match = True
-
-        for field in ["brand", "type", "abv", "volume"]:
-            form_value = form_data.get(field)
-            label_value = aggregated_extracted_data.get(field)
-
-            match, norm_form, norm_label = normalizer_service.compare_values(
-                field, form_value, label_value
+        field_results = {
+            field: compare_field(
+                field, form_data.get(field), aggregated_extracted_data.get(field)
             )
-
-            field_results[field] = FieldComparison(
-                match=match,
-                form_value=form_value,
-                label_value=label_value,
-                normalized_form=norm_form,
-                normalized_label=norm_label,
+            for field in ("brand", "type", "abv", "volume")
+        }
+        all_match = all(result.match for result in field_results.values())
+
+        # Start LLM explanation; it only needs the comparison, so it runs
+        # while the images are being annotated
+        field_results_dict = FIELD_RESULTS_ADAPTER.dump_python(field_results)
+        explanation_task = asyncio.create_task(
+            llm_service.agenerate_comparison_explanation(
+                form_data, aggregated_extracted_data, field_results_dict
             )
+        )
 
-            if not match:
-                all_match = False
+        try:
+            # Annotate images with bounding boxes (saved as static files)
+            annotated_images = await asyncio.gather(
+                *(
+                    asyncio.to_thread(image_service.annotate_and_save, image_bytes, bboxes)
+                    for image_bytes, _, _, bboxes in processed
+                )
+            )
 
-        # Generate LLM explanation
-        field_results_dict = {
-            k: v.model_dump() for k, v in field_results.items()
-        }
-        explanation = llm_service.generate_comparison_explanation(
-            form_data, aggregated_extracted_data, field_results_dict
-        )
+            for idx, ((_, ocr_text, extracted, bboxes), annotated_image_url) in enumerate(
+                zip(processed, annotated_images)
+            ):
+                # Create BoundingBoxes object
+                bbox_objects = BoundingBoxes(
+                    brand=BoundingBox(**bboxes["brand"]) if bboxes.get("brand") else None,
+                    type=BoundingBox(**bboxes["type"]) if bboxes.get("type") else None,
+                    abv=BoundingBox(**bboxes["abv"]) if bboxes.get("abv") else None,
+                    volume=BoundingBox(**bboxes["volume"]) if bboxes.get("volume") else None,
+                )
+
+                # Create result for this image
+                results.append(
+                    ImageResult(
+                        image_index=idx,
+                        original_filename=images[idx].filename or f"image_{idx}",
+                        ocr_raw_text=ocr_text,
+                        extracted_data=ExtractedData(**extracted),
+                        bounding_boxes=bbox_objects,
+                        annotated_image_url=annotated_image_url,
+                    )
+                )
+
+            explanation = await explanation_task
+        finally:
+            # Don't leave the Gemini call running if annotation failed
+            explanation_task.cancel()
 
         comparison = ComparisonResult(
             is_match=all_match,
@@ -252,11 +305,6 @@ async def verify_label(
             status_code=500,
             detail=f"Error processing images: {str(e)}"
         )
-    
-    finally:
-        # Clean up: Delete all temporary files
-        for temp_path in temp_files:
-            delete_temp_file(temp_path)
 
 
 @router.get("/health")
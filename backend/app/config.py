@@ -1,6 +1,7 @@
 """Application configuration using pydantic-settings."""
 
-from functools import lru_cache
+import os
+from functools import cached_property, lru_cache
 from pydantic_settings import BaseSettings
 
 
@@ -9,6 +10,20 @@ class Settings(BaseSettings):
 
     # Gemini API
     gemini_api_key: str = ""
+    gemini_max_concurrency: int = 8
+    gemini_requests_per_minute: int = 1000
+
+    # Directory of the persistent vision result cache
+    llm_cache_dir: str = ".cache/llm"
+
+    # Use Gemini for mismatch explanations (few mismatches are summarized locally)
+    use_llm_explanation: bool = True
+
+    # Server worker processes (gunicorn/uvicorn also read WEB_CONCURRENCY)
+    web_concurrency: int = 1
+
+    # PaddleOCR CPU threads per worker process (0 = CPU cores / web_concurrency)
+    ocr_cpu_threads: int = 0
 
     # Environment
     environment: str = "development"
@@ -16,11 +31,23 @@ class Settings(BaseSettings):
     # CORS (allow all origins in development)
     cors_origins: str = "http://localhost:3000,http://localhost:3001,http://localhost:5173,http://10.0.0.18:3000,http://10.0.0.18:3001"
 
-    @property
+    @cached_property
     def cors_origins_list(self) -> list[str]:
-        """Parse CORS origins from comma-separated string."""
+        """Parse CORS origins from comma-separated string (computed once)."""
         return [origin.strip() for origin in self.cors_origins.split(",")]
 
+    @cached_property
+    def ocr_threads(self) -> int:
+        """PaddleOCR CPU threads per worker, splitting the cores across workers."""
+        if self.ocr_cpu_threads > 0:
+            return self.ocr_cpu_threads
+        return max(1, (os.cpu_count() or 1) // max(1, self.web_concurrency))
+
+    @cached_property
+    def is_development(self) -> bool:
+        """Whether the app runs in development mode (computed once)."""
+        return self.environment == "development"
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,10 +1,14 @@
 """FastAPI application entry point."""
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from app.config import get_settings
-from app.api.routes import router
+from app.api.routes import router, ocr_service, ocr_scheduler
+from app.services.image_service import ImageService, STATIC_DIR, ANNOTATED_DIR
 
 # Configure logging
 logging.basicConfig(
@@ -14,6 +18,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger("ttb")
 
+# Annotated images older than this are purged from the static directory
+ANNOTATED_MAX_AGE_SECONDS = 3600
+PURGE_INTERVAL_SECONDS = 600
+
+# Create static directories once at import (StaticFiles requires them)
+ANNOTATED_DIR.mkdir(parents=True, exist_ok=True)
+
+
+async def purge_annotated_images_periodically():
+    """Background task that bounds disk usage of annotated images."""
+    while True:
+        removed = await asyncio.to_thread(
+            ImageService.purge_annotated_images, ANNOTATED_MAX_AGE_SECONDS
+        )
+        if removed:
+            logger.info(f"Purged {removed} annotated image(s)")
+        await asyncio.sleep(PURGE_INTERVAL_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up OCR, run the OCR queue and the annotated image janitor while serving."""
+    # Load PaddleOCR before serving so the first request doesn't pay for it
+    await asyncio.to_thread(ocr_service.warmup)
+    ocr_scheduler.start()
+    purge_task = asyncio.create_task(purge_annotated_images_periodically())
+    try:
+        yield
+    finally:
+        purge_task.cancel()
+        await ocr_scheduler.stop()
+
 
 def create_app() -> FastAPI:
     """Create and configure FastAPI application."""
@@ -25,11 +61,12 @@ def create_app() -> FastAPI:
         version="1.0.0",
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
 
     # Configure CORS for frontend
     # In development, allow all origins
-    origins = ["*"] if settings.environment == "development" else settings.cors_origins_list
+    origins = ["*"] if settings.is_development else settings.cors_origins_list
     app.add_middleware(
         CORSMiddleware,
         allow_origins=origins,
@@ -41,6 +78,9 @@ def create_app() -> FastAPI:
     # Include API routes
     app.include_router(router)
 
+    # Serve annotated images
+    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+
     @app.get("/")
     async def root():
         """Root endpoint with API information."""
@@ -1,12 +1,13 @@
 # Services package
 from .ocr_service import OCRService
-from .llm_service import LLMService
+from .llm_service import LLMService, get_llm_service
 from .image_service import ImageService
 from .normalizer_service import NormalizerService
 
 __all__ = [
     "OCRService",
     "LLMService",
+    "get_llm_service",
     "ImageService",
     "NormalizerService",
 ]
@@ -1,12 +1,47 @@
-"""Service for image annotation and Base64 encoding."""
+"""Service for image annotation and static file output."""
 
-import base64
 import io
-from PIL import Image, ImageDraw, ImageFont
+import itertools
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+import cv2
+import numpy as np
+import simplejpeg
+from cachetools import LRUCache
+from PIL import Image
+from app.utils import content_digest
+
+# Static files served by the app (mounted at /static)
+STATIC_DIR = Path(__file__).resolve().parent.parent.parent / "static"
+ANNOTATED_DIR = STATIC_DIR / "annotated"
+ANNOTATED_URL_PREFIX = "/static/annotated"
+
+# Per-process filename counter; the PID prefix keeps names unique across workers
+_counter = itertools.count()
+
+# Annotated image filenames keyed by (image content hash, bounding boxes)
+_ANNOT_CACHE: LRUCache = LRUCache(maxsize=512)
+_ANNOT_LOCK = threading.Lock()
+
+
+# Label text style (OpenCV Hershey font)
+_FONT = cv2.FONT_HERSHEY_SIMPLEX
+_FONT_SCALE = 1.0
+_FONT_THICKNESS = 2
+
+
+@lru_cache(maxsize=None)
+def _label_size(label: str) -> tuple[int, int]:
+    """Get (width, height) of a field label drawn with the label font."""
+    (width, height), baseline = cv2.getTextSize(label, _FONT, _FONT_SCALE, _FONT_THICKNESS)
+    return width, height + baseline
 
 
 class ImageService:
-    """Handles image annotation with bounding boxes and Base64 encoding."""
+    """Handles image annotation with bounding boxes and saving to static files."""
 
     # Colors for different fields (RGB)
     FIELD_COLORS = {
@@ -16,22 +51,60 @@ class ImageService:
         "volume": (255, 165, 0),   # Orange
     }
 
-    def __init__(self):
-        """Initialize image service."""
-        self._font = None
+    # Longest edge (px) of the working copy sent to OCR / vision
+    MAX_PROCESSING_EDGE = 1024
 
-    @property
-    def font(self) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
-        """Get font for labels (falls back to default if not available)."""
-        if self._font is None:
-            try:
-                self._font = ImageFont.truetype("DejaVuSans.ttf", 30)
-            except (OSError, IOError):
-                try:
-                    self._font = ImageFont.truetype("Arial.ttf", 30)
-                except (OSError, IOError):
-                    self._font = ImageFont.load_default()
-        return self._font
+    def downscale(
+        self,
+        image_bytes: bytes,
+        max_edge: int = MAX_PROCESSING_EDGE,
+    ) -> tuple[bytes, float]:
+        """
+        Downscale image for OCR / vision extraction.
+
+        Args:
+            image_bytes: Original image bytes
+            max_edge: Maximum length of the longest edge in pixels
+
+        Returns:
+            Tuple of (image_bytes, scale). If the image is already small
+            enough the original bytes are returned with scale 1.0, otherwise
+            a downscaled JPEG and the applied scale factor.
+        """
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            width, height = image.size
+            scale = min(1.0, max_edge / max(width, height))
+            if scale >= 1.0:
+                return image_bytes, 1.0
+
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+
+            resized = image.resize(
+                (max(1, int(width * scale)), max(1, int(height * scale))),
+                Image.Resampling.LANCZOS,
+            )
+
+        output = io.BytesIO()
+        resized.save(output, format="JPEG", quality=90)
+        return output.getvalue(), scale
+
+    @staticmethod
+    def scale_bounding_boxes(bounding_boxes: dict, factor: float) -> dict:
+        """
+        Scale bounding box coordinates by a constant factor.
+
+        Args:
+            bounding_boxes: Dict mapping field names to bbox dicts (or None)
+            factor: Multiplier applied to every coordinate
+
+        Returns:
+            Dict with scaled bounding boxes
+        """
+        return {
+            field: {key: round(value * factor) for key, value in bbox.items()} if bbox else None
+            for field, bbox in bounding_boxes.items()
+        }
 
     def draw_bounding_boxes(
         self,
@@ -48,35 +121,30 @@ class ImageService:
         Returns:
             Annotated image bytes
         """
-        # Open image
-        image = Image.open(io.BytesIO(image_bytes))
-
-        # Always convert to RGB for consistent color handling
-        if image.mode != "RGB":
-            image = image.convert("RGB")
-
-        draw = ImageDraw.Draw(image)
+        # Decode straight to a BGR array; EXIF orientation is ignored to keep
+        # pixel coordinates consistent with OCR
+        image = cv2.imdecode(
+            np.frombuffer(image_bytes, np.uint8),
+            cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION,
+        )
+        if image is None:
+            raise ValueError("Unable to decode image")
 
         # Draw each bounding box
         for field, bbox in bounding_boxes.items():
             if bbox is None:
                 continue
 
-            color = self.FIELD_COLORS.get(field, (128, 128, 128))
+            # OpenCV expects BGR
+            color = self.FIELD_COLORS.get(field, (128, 128, 128))[::-1]
 
             # Draw rectangle
             x, y, w, h = bbox["x"], bbox["y"], bbox["width"], bbox["height"]
-            draw.rectangle(
-                [x, y, x + w, y + h],
-                outline=color,
-                width=1,
-            )
+            cv2.rectangle(image, (x, y), (x + w, y + h), color, 1)
 
             # Draw label background
             label = field.upper()
-            text_bbox = draw.textbbox((0, 0), label, font=self.font)
-            text_width = text_bbox[2] - text_bbox[0]
-            text_height = text_bbox[3] - text_bbox[1]
+            text_width, text_height = _label_size(label)
 
             label_x = x
             label_y = y - text_height - 4
@@ -85,42 +153,95 @@ class ImageService:
             if label_y < 0:
                 label_y = y + h + 2
 
-            draw.rectangle(
-                [label_x, label_y, label_x + text_width + 4, label_y + text_height + 2],
-                fill=color,
+            cv2.rectangle(
+                image,
+                (label_x, label_y),
+                (label_x + text_width + 4, label_y + text_height + 2),
+                color,
+                cv2.FILLED,
             )
 
-            # Draw label text
-            draw.text(
-                (label_x + 2, label_y),
+            # Draw label text (putText anchors at the baseline)
+            cv2.putText(
+                image,
                 label,
-                fill=(255, 255, 255),
-                font=self.font,
+                (label_x + 2, label_y + text_height - 2),
+                _FONT,
+                _FONT_SCALE,
+                (255, 255, 255),
+                _FONT_THICKNESS,
+                cv2.LINE_AA,
             )
 
-        # Save to bytes
-        output = io.BytesIO()
-        image.save(output, format="JPEG", quality=90)
-        return output.getvalue()
+        # Encode to JPEG bytes with libjpeg-turbo (image is BGR)
+        return simplejpeg.encode_jpeg(image, quality=90, colorspace="BGR", fastdct=True)
 
-    def annotate_and_encode(
+    def annotate_and_save(
         self,
         image_bytes: bytes,
         bounding_boxes: dict,
     ) -> str:
         """
-        Draw bounding boxes and return as Base64 encoded string.
+        Draw bounding boxes and save the result as a static file.
 
         Args:
             image_bytes: Original image bytes
             bounding_boxes: Dict mapping field names to bbox dicts
 
         Returns:
-            Base64 encoded annotated image (data URI format)
+            URL path of the annotated image (served under /static)
         """
+        key = (
+            content_digest(image_bytes),
+            tuple(
+                (field, tuple(bbox.items()) if bbox else None)
+                for field, bbox in sorted(bounding_boxes.items())
+            ),
+        )
+        # Called from worker threads, so guard the shared cache
+        with _ANNOT_LOCK:
+            cached = _ANNOT_CACHE.get(key)
+        if cached is not None:
+            try:
+                # Refresh mtime so the file outlives the purge window
+                # (never creates it, unlike touch)
+                os.utime(ANNOTATED_DIR / cached)
+                return f"{ANNOTATED_URL_PREFIX}/{cached}"
+            except FileNotFoundError:
+                # Already purged - forget it and regenerate below
+                with _ANNOT_LOCK:
+                    if _ANNOT_CACHE.get(key) == cached:
+                        del _ANNOT_CACHE[key]
+
         # Draw bounding boxes
         annotated_bytes = self.draw_bounding_boxes(image_bytes, bounding_boxes)
-        
-        # Convert to Base64
-        base64_data = base64.b64encode(annotated_bytes).decode("utf-8")
-        return f"data:image/jpeg;base64,{base64_data}"
+
+        # Save to static directory
+        filename = f"{os.getpid()}_{time.monotonic_ns()}_{next(_counter)}.jpg"
+        (ANNOTATED_DIR / filename).write_bytes(annotated_bytes)
+
+        with _ANNOT_LOCK:
+            _ANNOT_CACHE[key] = filename
+        return f"{ANNOTATED_URL_PREFIX}/{filename}"
+
+    @staticmethod
+    def purge_annotated_images(max_age_seconds: float) -> int:
+        """
+        Delete annotated images older than the given age.
+
+        Args:
+            max_age_seconds: Maximum file age (by modification time)
+
+        Returns:
+            Number of deleted files
+        """
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for path in ANNOTATED_DIR.glob("*.jpg"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                pass  # Ignore files removed concurrently
+        return removed
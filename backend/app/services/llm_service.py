@@ -1,63 +1,108 @@
 """Service for LLM-based text parsing and comparison using Gemini."""
 
-import json
+import asyncio
+import orjson
 import logging
 import base64
+import os
+import threading
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+from typing import AsyncIterator
+import diskcache
 import google.generativeai as genai
+from aiolimiter import AsyncLimiter
+from cachetools import TTLCache
+from typing_extensions import TypedDict
 from app.config import get_settings
+from app.services.image_service import ImageService
+from app.utils import content_digest
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+# Logging is configured by the application entry point
 logger = logging.getLogger(__name__)
 
+# MIME types for supported image file extensions
+_MIME_BY_SUFFIX = MappingProxyType({
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+})
 
-class LLMService:
-    """Handles LLM operations for text parsing and comparison."""
 
-    def __init__(self):
-        """Initialize Gemini client."""
-        settings = get_settings()
-        self._api_key = settings.gemini_api_key
-        
-        if not self._api_key or self._api_key == "your_gemini_api_key_here":
-            logger.warning("GEMINI_API_KEY is not configured! LLM features will not work.")
-        else:
-            genai.configure(api_key=self._api_key)
-            logger.info("Gemini API configured successfully")
-        
-        self._model = None
-        self._vision_model = None
+class ValidatedExtraction(TypedDict):
+    """Vision response schema: label validation plus extracted fields."""
 
-    @property
-    def model(self):
-        """Lazy initialization of Gemini text model."""
-        if self._model is None:
-            self._model = genai.GenerativeModel("gemini-2.5-flash")
-            logger.info("Using Gemini model: gemini-2.5-flash")
-        return self._model
+    is_alcohol_label: bool
+    quality_ok: bool
+    validation_message: str
+    brand: str | None
+    type: str | None
+    abv: str | None
+    volume: str | None
 
-    @property
-    def vision_model(self):
-        """Lazy initialization of Gemini vision model."""
-        if self._vision_model is None:
-            self._vision_model = genai.GenerativeModel("gemini-2.5-flash")
-            logger.info("Using Gemini vision model: gemini-2.5-flash")
-        return self._vision_model
 
-    def extract_from_image_simple(self, image_path: str) -> dict:
-        """
-        Extract label information directly from image using vision model.
-        Also validates if image is a valid alcohol label with good quality.
-        
-        Args:
-            image_path: Path to the image file
-            
-        Returns:
-            Dict with brand, type, abv, volume fields and validation info
-        """
+class BBoxSchema(TypedDict):
+    """Vision response schema: pixel bounding box."""
+
+    x: int
+    y: int
+    width: int
+    height: int
+
 
-        prompt = """You are a label information extractor for alcohol beverage labels.
+class BBoxExtraction(TypedDict):
+    """Vision response schema: extracted fields with bounding boxes."""
+
+    brand: str | None
+    brand_bbox: BBoxSchema | None
+    type: str | None
+    type_bbox: BBoxSchema | None
+    abv: str | None
+    abv_bbox: BBoxSchema | None
+    volume: str | None
+    volume_bbox: BBoxSchema | None
+
+
+# One model serves both text and vision requests
+_MODEL_NAME = "gemini-2.5-flash"
+
+# Longest edge (px) of images sent to Gemini; larger inputs only add upload
+# bytes and image tokens
+_VISION_MAX_EDGE = 1568
+
+_image_service = ImageService()
+
+# JSON mode: Gemini returns bare JSON matching the schema (no markdown fences)
+_EXTRACTION_CONFIG = genai.GenerationConfig(
+    response_mime_type="application/json",
+    response_schema=ValidatedExtraction,
+)
+_BATCH_EXTRACTION_CONFIG = genai.GenerationConfig(
+    response_mime_type="application/json",
+    response_schema=list[ValidatedExtraction],
+)
+_BBOX_EXTRACTION_CONFIG = genai.GenerationConfig(
+    response_mime_type="application/json",
+    response_schema=BBoxExtraction,
+)
+
+
+_NL = "\n"
+
+# Read-only templates for error results (copied before being returned)
+_EMPTY_EXTRACT = MappingProxyType({"brand": None, "type": None, "abv": None, "volume": None})
+_EMPTY_BBOXES = MappingProxyType({"brand": None, "type": None, "abv": None, "volume": None})
+
+_BBOX_KEYS = ("x", "y", "width", "height")
+
+# Up to this many differences are summarized locally instead of by the LLM
+_LOCAL_EXPLANATION_MAX_DIFFERENCES = 2
+
+# Prompts (templates are filled with str.format; literal braces are doubled)
+_EXTRACTION_PROMPT = """You are a label information extractor for alcohol beverage labels.
 
 First, analyze this image:
 1. Is this an alcohol beverage label (beer, wine, spirits, etc.)?
@@ -93,96 +138,36 @@ Fields to extract:
 
 Do not include any explanation, just the JSON object."""
 
-        try:
-            # Read and encode image
-            image_path_obj = Path(image_path)
-            with open(image_path_obj, "rb") as f:
-                image_data = f.read()
-            
-            # Determine MIME type
-            suffix = image_path_obj.suffix.lower()
-            mime_type = {
-                ".jpg": "image/jpeg",
-                ".jpeg": "image/jpeg",
-                ".png": "image/png",
-                ".gif": "image/gif",
-                ".webp": "image/webp",
-            }.get(suffix, "image/jpeg")
-            
-            # Create image part for Gemini
-            image_part = {
-                "mime_type": mime_type,
-                "data": image_data
-            }
-            
-            logger.info(f"Sending image to Gemini vision model (simple): {image_path_obj.name}")
-            response = self.vision_model.generate_content([prompt, image_part])
-            response_text = response.text.strip()
-            logger.info(f"Gemini vision response: {response_text}")
+_BATCH_EXTRACTION_PROMPT_TEMPLATE = """You are a label information extractor for alcohol beverage labels.
 
-            # Remove markdown code blocks if present
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                response_text = "\n".join(lines[1:-1])
+You will receive {count} images, each preceded by its number ("Image 1:", "Image 2:", ...).
+Analyze each image independently:
+1. Is this an alcohol beverage label (beer, wine, spirits, etc.)?
+2. Is the image quality sufficient to read the text on the label?
 
-            result = json.loads(response_text)
-            
-            is_alcohol_label = result.get("is_alcohol_label", True)
-            quality_ok = result.get("quality_ok", True)
-            is_valid = is_alcohol_label and quality_ok
-            
-            parsed = {
-                "brand": result.get("brand"),
-                "type": result.get("type"),
-                "abv": result.get("abv"),
-                "volume": result.get("volume"),
-                "is_valid": is_valid,
-                "is_alcohol_label": is_alcohol_label,
-                "quality_ok": quality_ok,
-                "validation_message": result.get("validation_message", ""),
-            }
-            logger.info(f"Vision extracted result: {parsed}")
-            return parsed
-            
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {e}, response was: {response_text}")
-            return {
-                "brand": None,
-                "type": None,
-                "abv": None,
-                "volume": None,
-                "is_valid": True,  # Default to valid on parse error to not block user
-                "validation_message": f"JSON decode error: {e}",
-            }
-        except Exception as e:
-            logger.error(f"Error calling Gemini Vision API: {e}")
-            return {
-                "brand": None,
-                "type": None,
-                "abv": None,
-                "volume": None,
-                "is_valid": True,  # Default to valid on error to not block user
-                "validation_message": str(e),
-            }
+Respond with a JSON array containing exactly {count} objects, one per image, in the same order.
+Each object must have this format:
+{{
+    "is_alcohol_label": true or false,
+    "quality_ok": true or false,
+    "validation_message": "Valid alcohol label" or a brief explanation of the issue,
+    "brand": "extracted brand or null if not found",
+    "type": "extracted type or null if not found",
+    "abv": "extracted abv or null if not found",
+    "volume": "extracted volume or null if not found"
+}}
 
-    def extract_from_image(self, image_path: str, image_width: int = 0, image_height: int = 0) -> tuple[dict, dict]:
-        """
-        Extract label information directly from image using vision model.
-        Also attempts to get bounding box coordinates for each field.
-        
-        Args:
-            image_path: Path to the image file
-            image_width: Width of the image in pixels (for coordinate scaling)
-            image_height: Height of the image in pixels (for coordinate scaling)
-            
-        Returns:
-            Tuple of (extracted_data, bounding_boxes)
-            - extracted_data: Dict with brand, type, abv, volume fields
-            - bounding_boxes: Dict with bounding box for each field
-        """
-        empty_bboxes = {"brand": None, "type": None, "abv": None, "volume": None}
+If an image is NOT an alcohol label or its quality is too poor to read, set brand, type, abv and volume to null.
 
-        prompt = f"""You are a label information extractor for alcohol beverage labels.
+Fields to extract:
+- brand: The brand/distillery name (e.g., "Jack Daniel's", "Johnnie Walker")
+- type: The type of alcohol (e.g., "Tennessee Whiskey", "Single Malt Scotch Whisky")
+- abv: Alcohol by volume percentage (e.g., "40%", "43% ABV")
+- volume: The bottle volume (e.g., "750mL", "70cl", "1L")
+
+Do not include any explanation, just the JSON array."""
+
+_BBOX_EXTRACTION_PROMPT_TEMPLATE = """You are a label information extractor for alcohol beverage labels.
 Look at this label image and extract the following information WITH their approximate bounding box locations.
 
 The image dimensions are: {image_width}x{image_height} pixels.
@@ -217,94 +202,774 @@ If a field cannot be found in the image, use null for both value and bbox.
 Estimate bounding box coordinates as accurately as possible based on where you see the text.
 Do not include any explanation, just the JSON object."""
 
+_EXPLANATION_PROMPT_TEMPLATE = """You are a label verification assistant. Explain the differences between form data and label data clearly.
+
+MATCHES:
+{matches}
+
+DIFFERENCES:
+{differences}
+
+Provide a clear, concise explanation (2-3 sentences) of:
+1. What fields don't match
+2. The specific differences found
+3. What action might be needed
+
+Be professional and direct. Do not use markdown formatting."""
+
+
+# Persisted vision results are namespaced by model, prompts, response schemas
+# and generation configs, so changing any of them invalidates entries written
+# by older versions (schema fields are listed since a TypedDict repr is only
+# its name)
+_CACHE_NAMESPACE = content_digest(
+    _NL.join((
+        _MODEL_NAME,
+        str(_VISION_MAX_EDGE),
+        _EXTRACTION_PROMPT,
+        _BATCH_EXTRACTION_PROMPT_TEMPLATE,
+        _BBOX_EXTRACTION_PROMPT_TEMPLATE,
+        *(
+            repr(schema.__annotations__)
+            for schema in (ValidatedExtraction, BBoxSchema, BBoxExtraction)
+        ),
+        repr(_EXTRACTION_CONFIG),
+        repr(_BATCH_EXTRACTION_CONFIG),
+        repr(_BBOX_EXTRACTION_CONFIG),
+    )).encode()
+)[:8]
+
+# Expiry of persisted vision results (seconds)
+_DISK_CACHE_TTL = 7 * 24 * 3600
+
+
+class LLMService:
+    """Handles LLM operations for text parsing and comparison."""
+
+    def __init__(self):
+        """Initialize Gemini client."""
+        settings = get_settings()
+        self._api_key = settings.gemini_api_key
+        self._api_configured = (
+            bool(self._api_key) and self._api_key != "your_gemini_api_key_here"
+        )
+
+        if not self._api_configured:
+            logger.warning("GEMINI_API_KEY is not configured! LLM features will not work.")
+        else:
+            genai.configure(api_key=self._api_key)
+            logger.info("Gemini API configured successfully")
+        
+        self._use_llm_explanation = settings.use_llm_explanation
+
+        # Created eagerly (no network I/O) and shared by text and vision calls
+        self._model = genai.GenerativeModel(_MODEL_NAME)
+        logger.info("Using Gemini model: %s", _MODEL_NAME)
+
+        # Limits for async Gemini calls (in-flight requests and requests/minute)
+        self._semaphore = asyncio.Semaphore(settings.gemini_max_concurrency)
+        self._rate_limiter = AsyncLimiter(settings.gemini_requests_per_minute, 60)
+
+        # Parsed vision results (validation + extraction) keyed by
+        # (method, image content hash, ...); LRU-bounded and expiring after a day
+        self._result_cache: TTLCache = TTLCache(maxsize=2048, ttl=86400)
+        self._cache_lock = threading.Lock()
+
+        # Backed by an on-disk cache that survives restarts and is shared by
+        # worker processes (SQLite; safe across threads and processes)
+        self._disk_cache = diskcache.Cache(
+            settings.llm_cache_dir,
+            size_limit=512 * 1024**2,
+            eviction_policy="least-recently-used",
+        )
+
+    @staticmethod
+    def _disk_key(key: tuple) -> str:
+        """Convert an in-memory cache key to a namespaced disk cache key."""
+        return ":".join((_CACHE_NAMESPACE, *map(str, key)))
+
+    def _cache_get(self, key: tuple):
+        """Look up a cached vision result in memory, then on disk (None on miss)."""
+        with self._cache_lock:
+            value = self._result_cache.get(key)
+        if value is not None:
+            return value
+
         try:
-            # Read and encode image
-            image_path = Path(image_path)
-            with open(image_path, "rb") as f:
-                image_data = f.read()
-            
-            # Determine MIME type
-            suffix = image_path.suffix.lower()
-            mime_type = {
-                ".jpg": "image/jpeg",
-                ".jpeg": "image/jpeg",
-                ".png": "image/png",
-                ".gif": "image/gif",
-                ".webp": "image/webp",
-            }.get(suffix, "image/jpeg")
-            
-            # Create image part for Gemini
-            image_part = {
-                "mime_type": mime_type,
-                "data": image_data
-            }
-            
-            logger.info(f"Sending image to Gemini vision model: {image_path.name}")
-            response = self.vision_model.generate_content([prompt, image_part])
-            response_text = response.text.strip()
-            logger.info(f"Gemini vision response: {response_text}")
+            value = self._disk_cache.get(self._disk_key(key))
+        except diskcache.Timeout:
+            logger.warning("Vision disk cache busy, treating as miss")
+            return None
 
-            # Remove markdown code blocks if present
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                response_text = "\n".join(lines[1:-1])
+        if value is not None:
+            with self._cache_lock:
+                self._result_cache[key] = value
+        return value
 
-            result = json.loads(response_text)
-            
-            # Extract data
-            extracted = {
-                "brand": result.get("brand"),
-                "type": result.get("type"),
-                "abv": result.get("abv"),
-                "volume": result.get("volume"),
-            }
-            
-            # Extract and validate bounding boxes
-            def validate_bbox(bbox_data):
-                """Validate and convert bounding box data to proper format."""
-                if bbox_data is None:
-                    return None
-                if not isinstance(bbox_data, dict):
-                    return None
-                try:
-                    return {
-                        "x": int(bbox_data.get("x", 0)),
-                        "y": int(bbox_data.get("y", 0)),
-                        "width": int(bbox_data.get("width", 0)),
-                        "height": int(bbox_data.get("height", 0)),
-                    }
-                except (TypeError, ValueError):
-                    return None
+    def _cache_put(self, key: tuple, value, error: bool = False):
+        """Store a vision result unless it came from an error path."""
+        if error:
+            return
+        with self._cache_lock:
+            self._result_cache[key] = value
+        try:
+            self._disk_cache.set(self._disk_key(key), value, expire=_DISK_CACHE_TTL)
+        except diskcache.Timeout:
+            logger.warning("Vision disk cache busy, result not persisted")
+
+    @staticmethod
+    def _scaled_image_part(image_data: bytes, filename: str = "") -> tuple[dict, float]:
+        """
+        Build a Gemini inline image part, downscaled to the vision input size.
+
+        Args:
+            image_data: Image file bytes
+            filename: Filename (used for MIME type detection)
+
+        Returns:
+            Tuple of (image_part, scale) where scale is the applied resize factor
+        """
+        try:
+            work_data, scale = _image_service.downscale(image_data, _VISION_MAX_EDGE)
+        except OSError:
+            # Not decodable locally; let the model report on the original bytes
+            work_data, scale = image_data, 1.0
+
+        if scale < 1.0:
+            mime_type = "image/jpeg"  # downscaled copies are re-encoded as JPEG
+        else:
+            mime_type = _MIME_BY_SUFFIX.get(os.path.splitext(filename)[1].lower(), "image/jpeg")
+        return {"mime_type": mime_type, "data": work_data}, scale
+
+    def _load_image_part(self, image_path: str | Path) -> tuple[bytes, dict, float]:
+        """
+        Read an image file once and build its (downscaled) Gemini image part.
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            Tuple of (original image_data, image_part, scale)
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        image_data = Path(image_path).read_bytes()
+        return (image_data, *self._scaled_image_part(image_data, str(image_path)))
+
+    @property
+    def model(self):
+        """Gemini model used for both text and vision requests."""
+        return self._model
+
+    def _generate(self, contents, generation_config=None) -> "genai.types.GenerateContentResponse":
+        """
+        Call the model synchronously.
+
+        Args:
+            contents: Prompt (and image parts)
+            generation_config: Per-call generation config
+
+        Returns:
+            Gemini response
+        """
+        return self.model.generate_content(contents, generation_config=generation_config)
+
+    async def _agenerate(
+        self, contents, generation_config=None
+    ) -> "genai.types.AsyncGenerateContentResponse":
+        """
+        Call the model asynchronously within the concurrency and rate limits.
+
+        Args:
+            contents: Prompt (and image parts)
+            generation_config: Per-call generation config
+
+        Returns:
+            Gemini response
+        """
+        async with self._semaphore, self._rate_limiter:
+            return await self.model.generate_content_async(
+                contents, generation_config=generation_config
+            )
+
+    async def _astream(self, contents, generation_config=None) -> AsyncIterator[str]:
+        """
+        Stream response text, holding the concurrency and rate limits until it ends.
+
+        Args:
+            contents: Prompt (and image parts)
+            generation_config: Per-call generation config
+
+        Yields:
+            Text of each response chunk
+        """
+        async with self._semaphore, self._rate_limiter:
+            response = await self.model.generate_content_async(
+                contents, generation_config=generation_config, stream=True
+            )
+            async for chunk in response:
+                if chunk.parts:
+                    yield chunk.text
+
+    def extract_from_image_simple(self, image_path: str) -> dict:
+        """
+        Extract label information directly from image using vision model.
+        Also validates if image is a valid alcohol label with good quality.
+        
+        Args:
+            image_path: Path to the image file
             
-            bboxes = {
-                "brand": validate_bbox(result.get("brand_bbox")),
-                "type": validate_bbox(result.get("type_bbox")),
-                "abv": validate_bbox(result.get("abv_bbox")),
-                "volume": validate_bbox(result.get("volume_bbox")),
-            }
+        Returns:
+            Dict with brand, type, abv, volume fields and validation info
+        """
+        try:
+            image_data = Path(image_path).read_bytes()
+        except OSError as e:
+            logger.error("Error reading image file: %s", e)
+            return self._extraction_failure(e)
+
+        return self.extract_from_image_bytes(image_data, Path(image_path).name)
+
+    def extract_from_image_bytes(self, image_data: bytes, filename: str = "") -> dict:
+        """
+        Extract label information from in-memory image bytes using vision model.
+        Also validates if image is a valid alcohol label with good quality.
+
+        Results are cached by image content, so identical images skip the
+        Gemini round trip.
+        
+        Args:
+            image_data: Image file bytes
+            filename: Original filename (used for MIME type detection)
             
-            logger.info(f"Vision extracted result: {extracted}")
-            logger.info(f"Vision bounding boxes: {bboxes}")
-            return extracted, bboxes
+        Returns:
+            Dict with brand, type, abv, volume fields and validation info
+        """
+        return self.extract_from_images_bytes([(image_data, filename)])[0]
+
+    async def aextract_from_image_bytes(self, image_data: bytes, filename: str = "") -> dict:
+        """
+        Async variant of extract_from_image_bytes.
+
+        Args:
+            image_data: Image file bytes
+            filename: Original filename (used for MIME type detection)
+
+        Returns:
+            Dict with brand, type, abv, volume fields and validation info
+        """
+        return (await self.aextract_from_images_bytes([(image_data, filename)]))[0]
+
+    def extract_from_images_bytes(self, images: list[tuple[bytes, str]]) -> list[dict]:
+        """
+        Extract label information from several images with a single vision request.
+
+        Saves one Gemini round trip per additional image. Images already in
+        the result cache are not sent. Falls back to one request per image
+        if the batched response cannot be matched up.
+
+        Args:
+            images: List of (image_bytes, filename) tuples
+
+        Returns:
+            List of dicts (in the same order as images) with brand, type,
+            abv, volume fields and validation info
+        """
+        keys, results, missing = self._lookup_extractions(images)
+
+        if len(missing) == 1:
+            fresh = [self._extract_single(*images[missing[0]])]
+        elif missing:
+            fresh = self._extract_batch([images[idx] for idx in missing])
+        else:
+            fresh = []
+
+        return self._store_extractions(keys, results, missing, fresh)
+
+    async def aextract_from_images_bytes(self, images: list[tuple[bytes, str]]) -> list[dict]:
+        """
+        Async variant of extract_from_images_bytes.
+
+        The per-image fallback requests run concurrently. Hashing, disk
+        cache I/O and image downscaling run in worker threads.
+
+        Args:
+            images: List of (image_bytes, filename) tuples
+
+        Returns:
+            List of dicts (in the same order as images) with brand, type,
+            abv, volume fields and validation info
+        """
+        keys, results, missing = await asyncio.to_thread(self._lookup_extractions, images)
+
+        if len(missing) == 1:
+            fresh = [await self._aextract_single(*images[missing[0]])]
+        elif missing:
+            fresh = await self._aextract_batch([images[idx] for idx in missing])
+        else:
+            fresh = []
+
+        return await asyncio.to_thread(self._store_extractions, keys, results, missing, fresh)
+
+    def _lookup_extractions(
+        self, images: list[tuple[bytes, str]]
+    ) -> tuple[list[tuple], list[dict | None], list[int]]:
+        """
+        Look up cached extraction results for a list of images.
+
+        Args:
+            images: List of (image_bytes, filename) tuples
+
+        Returns:
+            Tuple of (cache_keys, results, missing) where results holds None
+            for each image listed (by index) in missing
+        """
+        keys = [("extract", content_digest(image_data)) for image_data, _ in images]
+        results = [self._cache_get(key) for key in keys]
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        if len(missing) < len(images):
+            logger.info("Vision result cache hits: %s/%s", len(images) - len(missing), len(images))
+        return keys, results, missing
+
+    def _store_extractions(
+        self,
+        keys: list[tuple],
+        results: list[dict | None],
+        missing: list[int],
+        fresh: list[dict],
+    ) -> list[dict]:
+        """
+        Fill in freshly extracted results and cache the successful ones.
+
+        Args:
+            keys: Cache keys per image
+            results: Results per image (None where missing)
+            missing: Indexes of images that were sent to the model
+            fresh: Results for the missing images, in the same order
+
+        Returns:
+            Complete list of results
+        """
+        for idx, parsed in zip(missing, fresh):
+            self._cache_put(keys[idx], parsed, error="error" in parsed)
+            results[idx] = parsed
+        return results
+
+    def _single_request(
+        self, image_data: bytes, filename: str = ""
+    ) -> tuple[list, genai.GenerationConfig]:
+        """
+        Build the validation + extraction request for one image.
+
+        Args:
+            image_data: Image file bytes
+            filename: Original filename (used for MIME type detection)
+
+        Returns:
+            Tuple of (Gemini content parts, generation config)
+        """
+        logger.info("Sending image to Gemini vision model (simple): %s", filename)
+        return [_EXTRACTION_PROMPT, self._scaled_image_part(image_data, filename)[0]], _EXTRACTION_CONFIG
+
+    def _batch_request(
+        self, images: list[tuple[bytes, str]]
+    ) -> tuple[list, genai.GenerationConfig]:
+        """
+        Build the validation + extraction request for several images.
+
+        Args:
+            images: List of (image_bytes, filename) tuples
+
+        Returns:
+            Tuple of (Gemini content parts, generation config)
+        """
+        logger.info("Sending %s images to Gemini vision model (batch)", len(images))
+        prompt = _BATCH_EXTRACTION_PROMPT_TEMPLATE.format(count=len(images))
+
+        contents = [prompt]
+        for idx, (image_data, filename) in enumerate(images, start=1):
+            contents.append(f"Image {idx}:")
+            contents.append(self._scaled_image_part(image_data, filename)[0])
+        return contents, _BATCH_EXTRACTION_CONFIG
+
+    def _parse_single_response(self, response_text: str) -> dict:
+        """
+        Parse a single-image validation + extraction response.
+
+        Args:
+            response_text: JSON text returned by the vision model
+
+        Returns:
+            Dict with brand, type, abv, volume fields and validation info
+        """
+        response_text = response_text.strip()
+        logger.info("Gemini vision response: %s", response_text)
+
+        parsed = self._parse_validated_extraction(orjson.loads(response_text))
+        logger.debug("Vision extracted result: %s", parsed)
+        return parsed
+
+    def _parse_batch_response(self, response_text: str, count: int) -> list[dict]:
+        """
+        Parse a batched validation + extraction response.
+
+        Args:
+            response_text: JSON array text returned by the vision model
+            count: Number of images in the request
+
+        Returns:
+            List of result dicts in request order
+
+        Raises:
+            ValueError: If the response does not hold exactly one result per image
+        """
+        response_text = response_text.strip()
+        logger.info("Gemini vision batch response: %s", response_text)
+
+        result = orjson.loads(response_text)
+        if not isinstance(result, list) or len(result) != count:
+            raise ValueError(f"Expected a JSON array of {count} results")
+
+        parsed = [self._parse_validated_extraction(item) for item in result]
+        logger.debug("Vision extracted batch result: %s", parsed)
+        return parsed
+
+    def _extract_single(self, image_data: bytes, filename: str = "") -> dict:
+        """
+        Run a single-image validation + extraction request (uncached).
+
+        Args:
+            image_data: Image file bytes
+            filename: Original filename (used for MIME type detection)
+
+        Returns:
+            Dict with brand, type, abv, volume fields and validation info
+        """
+        try:
+            response = self._generate(*self._single_request(image_data, filename))
+            return self._parse_single_response(response.text)
+        except Exception as e:
+            logger.error("Error calling Gemini Vision API: %s", e)
+            return self._extraction_failure(e)
+
+    async def _aextract_single(self, image_data: bytes, filename: str = "") -> dict:
+        """
+        Async variant of _extract_single.
+
+        Args:
+            image_data: Image file bytes
+            filename: Original filename (used for MIME type detection)
+
+        Returns:
+            Dict with brand, type, abv, volume fields and validation info
+        """
+        try:
+            request = await asyncio.to_thread(self._single_request, image_data, filename)
+            response = await self._agenerate(*request)
+            return self._parse_single_response(response.text)
+        except Exception as e:
+            logger.error("Error calling Gemini Vision API: %s", e)
+            return self._extraction_failure(e)
+
+    def _extract_batch(self, images: list[tuple[bytes, str]]) -> list[dict]:
+        """
+        Run a batched validation + extraction request (uncached).
+
+        Args:
+            images: List of (image_bytes, filename) tuples (at least two)
+
+        Returns:
+            List of result dicts in the same order as images
+        """
+        try:
+            response = self._generate(*self._batch_request(images))
+            return self._parse_batch_response(response.text, len(images))
+        except Exception as e:
+            logger.error("Batched vision extraction failed, retrying per image: %s", e)
+            return [
+                self._extract_single(image_data, filename)
+                for image_data, filename in images
+            ]
+
+    async def _aextract_batch(self, images: list[tuple[bytes, str]]) -> list[dict]:
+        """
+        Async variant of _extract_batch; the per-image fallback runs concurrently.
+
+        Args:
+            images: List of (image_bytes, filename) tuples (at least two)
+
+        Returns:
+            List of result dicts in the same order as images
+        """
+        try:
+            request = await asyncio.to_thread(self._batch_request, images)
+            response = await self._agenerate(*request)
+            return self._parse_batch_response(response.text, len(images))
+        except Exception as e:
+            logger.error("Batched vision extraction failed, retrying per image: %s", e)
+            return list(
+                await asyncio.gather(
+                    *(
+                        self._aextract_single(image_data, filename)
+                        for image_data, filename in images
+                    )
+                )
+            )
+
+    @staticmethod
+    def _extraction_failure(error: Exception) -> dict:
+        """
+        Build the result returned when validation + extraction fails.
+
+        Args:
+            error: Exception raised while reading the image or calling the model
+
+        Returns:
+            Dict with empty fields and the error message
+        """
+        if isinstance(error, orjson.JSONDecodeError):
+            message = f"JSON decode error: {error}"
+        else:
+            message = str(error)
+        return {
+            **_EMPTY_EXTRACT,
+            "is_valid": True,  # Default to valid on error to not block user
+            "validation_message": message,
+            "error": message,
+        }
+
+    @staticmethod
+    def _parse_validated_extraction(result: dict) -> dict:
+        """
+        Convert a raw validation + extraction response object into a result dict.
+
+        Args:
+            result: Parsed JSON object returned by the vision model
+
+        Returns:
+            Dict with brand, type, abv, volume fields and validation info
+        """
+        is_alcohol_label = result.get("is_alcohol_label", True)
+        quality_ok = result.get("quality_ok", True)
+        is_valid = is_alcohol_label and quality_ok
+
+        return {
+            "brand": result.get("brand"),
+            "type": result.get("type"),
+            "abv": result.get("abv"),
+            "volume": result.get("volume"),
+            "is_valid": is_valid,
+            "is_alcohol_label": is_alcohol_label,
+            "quality_ok": quality_ok,
+            "validation_message": result.get("validation_message", ""),
+        }
+
+    def extract_from_image(self, image_path: str, image_width: int = 0, image_height: int = 0) -> tuple[dict, dict]:
+        """
+        Extract label information directly from image using vision model.
+        Also attempts to get bounding box coordinates for each field.
+        
+        Args:
+            image_path: Path to the image file
+            image_width: Width of the image in pixels (for coordinate scaling)
+            image_height: Height of the image in pixels (for coordinate scaling)
             
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {e}, response was: {response_text}")
-            return {
-                "brand": None,
-                "type": None,
-                "abv": None,
-                "volume": None,
-                "error": f"JSON decode error: {e}",
-            }, empty_bboxes
+        Returns:
+            Tuple of (extracted_data, bounding_boxes)
+            - extracted_data: Dict with brand, type, abv, volume fields
+            - bounding_boxes: Dict with bounding box for each field
+        """
+        try:
+            # Read image and build the Gemini image part
+            image_path = Path(image_path)
+            image_data, image_part, scale = self._load_image_part(image_path)
+
+            # Bounding boxes depend on the stated dimensions, so key on them too
+            key = ("extract_bbox", content_digest(image_data), image_width, image_height)
+            cached = self._cache_get(key)
+            if cached is not None:
+                logger.info("Vision result cache hit: %s", image_path.name)
+                return cached
+
+            logger.info("Sending image to Gemini vision model: %s", image_path.name)
+            response = self._generate(
+                self._bbox_contents(image_part, image_width, image_height, scale),
+                _BBOX_EXTRACTION_CONFIG,
+            )
+            result = self._parse_bbox_response(response.text, scale)
+            self._cache_put(key, result)
+            return result
+
         except Exception as e:
-            logger.error(f"Error calling Gemini Vision API: {e}")
-            return {
-                "brand": None,
-                "type": None,
-                "abv": None,
-                "volume": None,
-                "error": str(e),
-            }, empty_bboxes
+            logger.error("Error calling Gemini Vision API: %s", e)
+            return self._bbox_failure(e)
+
+    def _bbox_contents(
+        self, image_part: dict, image_width: int, image_height: int, scale: float = 1.0
+    ) -> list:
+        """
+        Build the extraction-with-bounding-boxes request.
+
+        Args:
+            image_part: Gemini image part
+            image_width: Width of the original image in pixels
+            image_height: Height of the original image in pixels
+            scale: Resize factor applied to the image part
+
+        Returns:
+            List of Gemini content parts
+        """
+        # The model sees the downscaled image, so state its dimensions
+        prompt = _BBOX_EXTRACTION_PROMPT_TEMPLATE.format(
+            image_width=round(image_width * scale), image_height=round(image_height * scale)
+        )
+
+        return [prompt, image_part]
+
+    def _parse_bbox_response(self, response_text: str, scale: float = 1.0) -> tuple[dict, dict]:
+        """
+        Parse an extraction-with-bounding-boxes response.
+
+        Args:
+            response_text: JSON text returned by the vision model
+            scale: Resize factor applied to the image part
+
+        Returns:
+            Tuple of (extracted_data, bounding_boxes) in original image coordinates
+        """
+        response_text = response_text.strip()
+        logger.info("Gemini vision response: %s", response_text)
+
+        result = orjson.loads(response_text)
+
+        # Extract data
+        extracted = {
+            "brand": result.get("brand"),
+            "type": result.get("type"),
+            "abv": result.get("abv"),
+            "volume": result.get("volume"),
+        }
+
+        bboxes = {
+            field: self._validate_bbox(result.get(f"{field}_bbox")) for field in _EMPTY_BBOXES
+        }
+        if scale < 1.0:
+            bboxes = _image_service.scale_bounding_boxes(bboxes, 1 / scale)
+
+        logger.debug("Vision extracted result: %s", extracted)
+        logger.debug("Vision bounding boxes: %s", bboxes)
+        return extracted, bboxes
+
+    @staticmethod
+    def _validate_bbox(bbox_data) -> dict | None:
+        """Validate and convert bounding box data to proper format."""
+        if not isinstance(bbox_data, dict):
+            return None
+        try:
+            return {key: int(bbox_data.get(key, 0)) for key in _BBOX_KEYS}
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _bbox_failure(error: Exception) -> tuple[dict, dict]:
+        """
+        Build the result returned when extraction with bounding boxes fails.
+
+        Args:
+            error: Exception raised while reading the image or calling the model
+
+        Returns:
+            Tuple of (extracted_data with error, empty bounding_boxes)
+        """
+        if isinstance(error, orjson.JSONDecodeError):
+            message = f"JSON decode error: {error}"
+        else:
+            message = str(error)
+        return {**_EMPTY_EXTRACT, "error": message}, dict(_EMPTY_BBOXES)
+
+    @staticmethod
+    def _format_field_line(field: str, result: dict) -> tuple[bool, str]:
+        """
+        Format one field comparison as a prompt line.
+
+        Args:
+            field: Field name
+            result: Comparison result dict for the field
+
+        Returns:
+            Tuple of (is_match, line)
+        """
+        form_val = result["form_value"]
+        label_val = result["label_value"]
+        name = field.upper()
+
+        if not result["match"]:
+            return False, f"- {name}: Form says '{form_val}', but label shows '{label_val}'"
+        if form_val != label_val:
+            return True, (
+                f"- {name}: Form says '{form_val}', label shows '{label_val}' "
+                f"(equivalent after normalization: {result['normalized_form']})"
+            )
+        return True, f"- {name}: '{form_val}' - exact match"
+
+    @staticmethod
+    def _format_diff_summary(field_results: dict) -> str:
+        """
+        Build a templated summary of the mismatched fields.
+
+        Args:
+            field_results: Dict with comparison results per field
+
+        Returns:
+            One-line summary of differences
+        """
+        diff_summary = "; ".join(
+            f"{field}: form='{r.get('form_value')}' vs label='{r.get('label_value')}'"
+            for field, r in field_results.items()
+            if not r.get("match")
+        )
+        return f"Differences found: {diff_summary}"
+
+    def _explanation_prompt(self, field_results: dict) -> tuple[str | None, str | None]:
+        """
+        Decide how to explain a comparison and build the prompt if needed.
+
+        Args:
+            field_results: Dict with comparison results per field
+
+        Returns:
+            Tuple of (explanation, prompt): a ready explanation when no LLM
+            call is needed (prompt is None), otherwise the prompt to send
+        """
+        # Check if API key is configured
+        if not self._api_configured:
+            return "Unable to generate explanation: GEMINI_API_KEY not configured", None
+
+        # Build (is_match, line) pairs in one pass; field_results are dumped
+        # FieldComparison dicts, so every key is present
+        lines = [
+            self._format_field_line(field, result)
+            for field, result in field_results.items()
+        ]
+        matches = [line for is_match, line in lines if is_match]
+        differences = [line for is_match, line in lines if not is_match]
+
+        if not differences:
+            return "All fields match between the form data and label image. The label verification is successful.", None
+
+        # A templated summary is enough for a few differences; skip the round trip
+        if (
+            not self._use_llm_explanation
+            or len(differences) <= _LOCAL_EXPLANATION_MAX_DIFFERENCES
+        ):
+            return self._format_diff_summary(field_results), None
+
+        prompt = _EXPLANATION_PROMPT_TEMPLATE.format(
+            matches=_NL.join(matches) if matches else "None",
+            differences=_NL.join(differences),
+        )
+        return None, prompt
 
     def generate_comparison_explanation(
         self,
@@ -323,60 +988,89 @@ Do not include any explanation, just the JSON object."""
         Returns:
             Human-readable explanation of differences
         """
-        # Check if API key is configured
-        if not self._api_key or self._api_key == "your_gemini_api_key_here":
-            return "Unable to generate explanation: GEMINI_API_KEY not configured"
-
-        # Build differences list
-        differences = []
-        matches = []
-
-        for field, result in field_results.items():
-            form_val = result.get("form_value", "N/A")
-            label_val = result.get("label_value", "N/A")
-            norm_form = result.get("normalized_form", "N/A")
-            norm_label = result.get("normalized_label", "N/A")
-
-            if result.get("match"):
-                if form_val != label_val:
-                    matches.append(
-                        f"- {field.upper()}: Form says '{form_val}', label shows '{label_val}' "
-                        f"(equivalent after normalization: {norm_form})"
-                    )
-                else:
-                    matches.append(f"- {field.upper()}: '{form_val}' - exact match")
-            else:
-                differences.append(
-                    f"- {field.upper()}: Form says '{form_val}', but label shows '{label_val}'"
-                )
-
-        if not differences:
-            return "All fields match between the form data and label image. The label verification is successful."
+        explanation, prompt = self._explanation_prompt(field_results)
+        if prompt is None:
+            return explanation
 
-        prompt = f"""You are a label verification assistant. Explain the differences between form data and label data clearly.
+        try:
+            # Stream so chunks are consumed as they arrive
+            response = self.model.generate_content(prompt, stream=True)
+            return "".join(chunk.text for chunk in response if chunk.parts).strip()
+        except Exception as e:
+            logger.error("Error generating comparison explanation: %s", e)
+            # Fallback to simple explanation
+            return self._format_diff_summary(field_results)
 
-MATCHES:
-{chr(10).join(matches) if matches else "None"}
+    async def stream_comparison_explanation(
+        self,
+        form_data: dict,
+        label_data: dict,
+        field_results: dict,
+    ) -> AsyncIterator[str]:
+        """
+        Stream the explanation of differences between form and label data.
 
-DIFFERENCES:
-{chr(10).join(differences)}
+        Yields text chunks as Gemini produces them; local explanations and
+        the error fallback are yielded as a single chunk. Errors after the
+        first chunk are re-raised so the caller can discard the partial text.
 
-Provide a clear, concise explanation (2-3 sentences) of:
-1. What fields don't match
-2. The specific differences found
-3. What action might be needed
+        Args:
+            form_data: Dict with form input values
+            label_data: Dict with label extracted values
+            field_results: Dict with comparison results per field
 
-Be professional and direct. Do not use markdown formatting."""
+        Yields:
+            Chunks of the human-readable explanation
+        """
+        explanation, prompt = self._explanation_prompt(field_results)
+        if prompt is None:
+            yield explanation
+            return
 
+        streamed = False
         try:
-            response = self.model.generate_content(prompt)
-            return response.text.strip()
+            async for text in self._astream(prompt):
+                streamed = True
+                yield text
         except Exception as e:
-            logger.error(f"Error generating comparison explanation: {e}")
+            if streamed:
+                raise
+            logger.error("Error generating comparison explanation: %s", e)
             # Fallback to simple explanation
-            diff_summary = "; ".join(
-                f"{field}: form='{r.get('form_value')}' vs label='{r.get('label_value')}'"
-                for field, r in field_results.items()
-                if not r.get("match")
-            )
-            return f"Differences found: {diff_summary}"
+            yield self._format_diff_summary(field_results)
+
+    async def agenerate_comparison_explanation(
+        self,
+        form_data: dict,
+        label_data: dict,
+        field_results: dict,
+    ) -> str:
+        """
+        Async variant of generate_comparison_explanation (collects the stream).
+
+        Args:
+            form_data: Dict with form input values
+            label_data: Dict with label extracted values
+            field_results: Dict with comparison results per field
+
+        Returns:
+            Human-readable explanation of differences
+        """
+        try:
+            chunks = [
+                chunk
+                async for chunk in self.stream_comparison_explanation(
+                    form_data, label_data, field_results
+                )
+            ]
+        except Exception as e:
+            logger.error("Comparison explanation stream failed: %s", e)
+            # Fallback to simple explanation instead of a truncated one
+            return self._format_diff_summary(field_results)
+        return "".join(chunks).strip()
+
+
+@lru_cache
+def get_llm_service() -> LLMService:
+    """Get the shared LLMService instance (created once per process)."""
+    return LLMService()
@@ -1,12 +1,86 @@
 """Service for normalizing units and values for comparison."""
 
 import re
+import string
+from functools import lru_cache
+
+# Patterns are compiled once at import
+_PROOF_RE = re.compile(r"([\d.]+)\s*proof")
+_PERCENT_RE = re.compile(r"([\d.]+)\s*(%|percent|pct)")
+_NUM_RE = re.compile(r"([\d.]+)")
+
+# mL per volume unit (cc, ml and unrecognized units are taken as mL)
+_ML_PER_UNIT = {
+    "l": 1000,
+    "liter": 1000,
+    "liters": 1000,
+    "litre": 1000,
+    "litres": 1000,
+    "oz": 29.5735,
+    "floz": 29.5735,
+    "cl": 10,
+    "centiliter": 10,
+    "centiliters": 10,
+}
+
+_ASCII_LETTERS = frozenset(string.ascii_letters)
+
+
+def _parse_float(numeric: str) -> float | None:
+    """
+    Parse a run of digits and dots, rejecting obvious garbage up front.
+
+    Args:
+        numeric: Numeric string (e.g., "0.75")
+
+    Returns:
+        Parsed float or None if it isn't a number
+    """
+    if not numeric or numeric.count(".") > 1:
+        return None
+    try:
+        return float(numeric)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=256)
+def _format_ml(numeric: float) -> str:
+    """
+    Format a volume in mL (whole numbers without decimals).
+
+    Args:
+        numeric: Volume in mL
+
+    Returns:
+        Formatted volume (e.g., "750 mL", "751.2 mL")
+    """
+    if numeric == int(numeric):
+        return f"{int(numeric)} mL"
+    return f"{numeric:.1f} mL"
+
+
+@lru_cache(maxsize=256)
+def _format_abv(abv_value: float) -> str:
+    """
+    Format an ABV percentage (whole numbers without decimals).
+
+    Args:
+        abv_value: ABV in percent
+
+    Returns:
+        Formatted ABV (e.g., "45%", "43.5%")
+    """
+    if abv_value == int(abv_value):
+        return f"{int(abv_value)}%"
+    return f"{abv_value:.1f}%"
 
 
 class NormalizerService:
     """Handles normalization of volume and ABV units."""
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def normalize_volume(value: str | None) -> str | None:
         """
         Normalize volume to standard mL format.
@@ -15,7 +89,7 @@ class NormalizerService:
         - cc -> mL (1:1)
         - L/l/liters -> mL (x1000)
         - ml/ML -> mL (case normalization)
-        - oz -> mL (x29.5735)
+        - oz/fl oz -> mL (x29.5735)
 
         Args:
             value: Volume string (e.g., "750cc", "0.75L", "750ml")
@@ -28,35 +102,37 @@ class NormalizerService:
 
         value = value.strip()
 
-        # Extract numeric value and unit
-        match = re.match(r"([\d.]+)\s*([a-zA-Z]+)", value)
-        if not match:
+        # Extract numeric value and unit in one scan: digits/dots, optional
+        # whitespace, then a run of ASCII letters (anything after is ignored)
+        length = len(value)
+        num_end = 0
+        while num_end < length and (value[num_end] == "." or value[num_end].isdecimal()):
+            num_end += 1
+        unit_start = num_end
+        while unit_start < length and value[unit_start].isspace():
+            unit_start += 1
+        unit_end = unit_start
+        while unit_end < length and value[unit_end] in _ASCII_LETTERS:
+            unit_end += 1
+        if num_end == 0 or unit_end == unit_start:
             return value  # Return original if can't parse
 
-        numeric_str, unit = match.groups()
-        try:
-            numeric = float(numeric_str)
-        except ValueError:
+        numeric = _parse_float(value[:num_end])
+        if numeric is None:
             return value
 
-        unit_lower = unit.lower()
+        unit = value[unit_start:unit_end].lower()
+        if unit == "fl" and value[unit_end:].lstrip()[:2].lower() == "oz":
+            unit = "floz"  # "fl oz" is written with a space
 
         # Convert to mL
-        if unit_lower in ("l", "liter", "liters", "litre", "litres"):
-            numeric = numeric * 1000
-        elif unit_lower in ("oz", "fl oz", "floz"):
-            numeric = numeric * 29.5735
-        elif unit_lower in ("cl", "centiliter", "centiliters"):
-            numeric = numeric * 10
-        # cc, ml, mL are already in mL equivalent
+        numeric = numeric * _ML_PER_UNIT.get(unit, 1)
 
         # Format result
-        if numeric == int(numeric):
-            return f"{int(numeric)} mL"
-        else:
-            return f"{numeric:.1f} mL"
+        return _format_ml(numeric)
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def normalize_abv(value: str | None) -> str | None:
         """
         Normalize ABV to standard percentage format.
@@ -78,33 +154,34 @@ class NormalizerService:
         value = value.strip().lower()
 
         # Handle proof
-        proof_match = re.match(r"([\d.]+)\s*proof", value)
+        proof_match = _PROOF_RE.match(value)
         if proof_match:
-            proof_value = float(proof_match.group(1))
+            proof_value = _parse_float(proof_match.group(1))
+            if proof_value is None:
+                return value
             abv_value = proof_value / 2
-            if abv_value == int(abv_value):
-                return f"{int(abv_value)}%"
-            return f"{abv_value:.1f}%"
+            return _format_abv(abv_value)
 
         # Extract percentage value
-        percent_match = re.match(r"([\d.]+)\s*(%|percent|pct)", value)
+        percent_match = _PERCENT_RE.match(value)
         if percent_match:
-            abv_value = float(percent_match.group(1))
-            if abv_value == int(abv_value):
-                return f"{int(abv_value)}%"
-            return f"{abv_value:.1f}%"
+            abv_value = _parse_float(percent_match.group(1))
+            if abv_value is None:
+                return value
+            return _format_abv(abv_value)
 
         # Try to extract just a number (assume it's already a percentage)
-        num_match = re.match(r"([\d.]+)", value)
+        num_match = _NUM_RE.match(value)
         if num_match:
-            abv_value = float(num_match.group(1))
-            if abv_value == int(abv_value):
-                return f"{int(abv_value)}%"
-            return f"{abv_value:.1f}%"
+            abv_value = _parse_float(num_match.group(1))
+            if abv_value is None:
+                return value
+            return _format_abv(abv_value)
 
         return value
 
     @staticmethod
+    @lru_cache(maxsize=4096)
     def normalize_text(value: str | None) -> str | None:
         """
         Normalize text for comparison (brand, type).
@@ -126,8 +203,27 @@ class NormalizerService:
         normalized = " ".join(value.lower().split())
         return normalized
 
+    @staticmethod
+    def normalize_field(field: str, value: str | None) -> str | None:
+        """
+        Normalize a value according to its field type.
+
+        Args:
+            field: Field name (brand, type, abv, volume)
+            value: Raw value string
+
+        Returns:
+            Normalized value string
+        """
+        if field == "volume":
+            return NormalizerService.normalize_volume(value)
+        if field == "abv":
+            return NormalizerService.normalize_abv(value)
+        return NormalizerService.normalize_text(value)  # brand, type
+
+    @staticmethod
     def compare_values(
-        self, field: str, form_value: str | None, label_value: str | None
+        field: str, form_value: str | None, label_value: str | None
     ) -> tuple[bool, str | None, str | None]:
         """
         Compare form value with label value after normalization.
@@ -140,15 +236,12 @@ class NormalizerService:
         Returns:
             Tuple of (match, normalized_form, normalized_label)
         """
-        if field == "volume":
-            norm_form = self.normalize_volume(form_value)
-            norm_label = self.normalize_volume(label_value)
-        elif field == "abv":
-            norm_form = self.normalize_abv(form_value)
-            norm_label = self.normalize_abv(label_value)
-        else:  # brand, type
-            norm_form = self.normalize_text(form_value)
-            norm_label = self.normalize_text(label_value)
+        norm_form = NormalizerService.normalize_field(field, form_value)
+        if form_value == label_value:
+            # Identical inputs normalize identically - skip the second pass
+            return bool(norm_form), norm_form, norm_form
+
+        norm_label = NormalizerService.normalize_field(field, label_value)
 
         match = norm_form == norm_label if norm_form and norm_label else False
         return match, norm_form, norm_label
@@ -1,9 +1,63 @@
 """Service for OCR text extraction using PaddleOCR."""
 
 from paddleocr import PaddleOCR
-from PIL import Image
+import cv2
 import numpy as np
-import io
+import asyncio
+import dataclasses
+import logging
+import threading
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# CPU inference settings (PaddleOCR 2.7 has no high-performance inference
+# mode); thread count comes from settings.ocr_threads
+_ENABLE_MKLDNN = True
+# One image per request: larger batches only grow Paddle's memory arena on CPU
+_REC_BATCH_NUM = 1
+_CLS_BATCH_NUM = 1
+
+
+@dataclasses.dataclass
+class OCRResults:
+    """
+    Column-oriented OCR output, one row per detected text line.
+
+    Attributes:
+        texts: Recognized text per line
+        confidences: (N,) recognition confidences
+        bboxes: (N, 4) integer rectangles as x, y, width, height
+        polygons: (N, 4, 2) integer corner points
+        texts_lower: Lowercased, stripped texts for searching
+    """
+
+    texts: list[str]
+    confidences: np.ndarray
+    bboxes: np.ndarray
+    polygons: np.ndarray
+    texts_lower: list[str] = dataclasses.field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.texts_lower = [text.lower().strip() for text in self.texts]
+
+    @classmethod
+    def empty(cls) -> "OCRResults":
+        """Results for an image without detected text."""
+        return cls(
+            texts=[],
+            confidences=np.empty(0, dtype=np.float64),
+            bboxes=np.empty((0, 4), dtype=int),
+            polygons=np.empty((0, 4, 2), dtype=int),
+        )
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def bbox(self, index: int) -> dict:
+        """Bounding box dict of one line."""
+        x, y, width, height = self.bboxes[index].tolist()
+        return {"x": x, "y": y, "width": width, "height": height}
 
 
 class OCRService:
@@ -12,19 +66,50 @@ class OCRService:
     def __init__(self):
         """Initialize PaddleOCR with English language support."""
         self._ocr = None
+        # The PaddleOCR predictor is not thread-safe; guards its lazy
+        # initialization and every inference call
+        self._lock = threading.RLock()
 
     @property
     def ocr(self) -> PaddleOCR:
         """Lazy initialization of PaddleOCR instance."""
         if self._ocr is None:
-            self._ocr = PaddleOCR(
-                use_angle_cls=True,
-                lang="en",
-                show_log=False,
-            )
+            with self._lock:
+                if self._ocr is None:
+                    self._ocr = PaddleOCR(
+                        use_angle_cls=True,
+                        lang="en",
+                        show_log=False,
+                        enable_mkldnn=_ENABLE_MKLDNN,
+                        cpu_threads=get_settings().ocr_threads,
+                        rec_batch_num=_REC_BATCH_NUM,
+                        cls_batch_num=_CLS_BATCH_NUM,
+                    )
         return self._ocr
 
-    def _process_ocr_result(self, result) -> tuple[str, list[dict]]:
+    def _run_ocr(self, image):
+        """
+        Run the predictor on one image, one call at a time.
+
+        Args:
+            image: BGR image array or image file path
+
+        Returns:
+            Raw OCR result from PaddleOCR
+        """
+        with self._lock:
+            return self.ocr.ocr(image, cls=True)
+
+    def warmup(self) -> None:
+        """Load the OCR models and run one dummy inference ahead of traffic."""
+        self._run_ocr(np.zeros((64, 64, 3), dtype=np.uint8))
+        logger.info(
+            "PaddleOCR ready (mkldnn=%s, cpu_threads=%s)",
+            _ENABLE_MKLDNN,
+            get_settings().ocr_threads,
+        )
+
+    def _process_ocr_result(self, result) -> tuple[str, OCRResults]:
         """
         Process OCR result and return formatted output.
 
@@ -34,82 +119,128 @@ class OCRService:
         Returns:
             Tuple of (full_text, ocr_results)
         """
-        ocr_results = []
-        text_parts = []
-
-        if result and result[0]:
-            for line in result[0]:
-                bbox_points = line[0]  # [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
-                text = line[1][0]
-                confidence = line[1][1]
-
-                # Convert polygon to rectangle bounding box
-                xs = [p[0] for p in bbox_points]
-                ys = [p[1] for p in bbox_points]
-                bbox = {
-                    "x": int(min(xs)),
-                    "y": int(min(ys)),
-                    "width": int(max(xs) - min(xs)),
-                    "height": int(max(ys) - min(ys)),
-                }
-
-                ocr_results.append({
-                    "text": text,
-                    "confidence": confidence,
-                    "bbox": bbox,
-                    "polygon": [[int(p[0]), int(p[1])] for p in bbox_points],
-                })
-                text_parts.append(text)
-
-        full_text = " ".join(text_parts)
+        if not (result and result[0]):
+            return "", OCRResults.empty()
+
+        lines = result[0]
+        texts = [line[1][0] for line in lines]
+
+        # Stack all polygons into one (N, 4, 2) array and convert them to
+        # rectangle bounding boxes in a single vectorized pass
+        polygons = np.asarray([line[0] for line in lines], dtype=np.float64)
+        mins = polygons.min(axis=1)
+        sizes = polygons.max(axis=1) - mins
+        ocr_results = OCRResults(
+            texts=texts,
+            confidences=np.asarray([line[1][1] for line in lines], dtype=np.float64),
+            bboxes=np.concatenate([mins.astype(int), sizes.astype(int)], axis=1),
+            polygons=polygons.astype(int),
+        )
+
+        full_text = " ".join(texts)
         return full_text, ocr_results
 
-    def extract_text(self, image_bytes: bytes) -> tuple[str, list[dict]]:
+    def extract_text(self, image_bytes: bytes) -> tuple[str, OCRResults]:
         """
         Extract text from image bytes with bounding box information.
 
+        Use this for images that only exist in memory (e.g. uploads); for
+        files already on disk prefer extract_text_from_path, which skips
+        loading the file into Python first.
+
         Args:
             image_bytes: Image file bytes
 
         Returns:
             Tuple of (full_text, ocr_results)
             - full_text: All detected text concatenated
-            - ocr_results: List of dicts with 'text', 'confidence', 'bbox' keys
+            - ocr_results: OCRResults with text, confidence, bbox per line
+        """
+        return self.extract_text_from_array(self.decode_image(image_bytes))
+
+    @staticmethod
+    def decode_image(image_bytes: bytes) -> np.ndarray:
         """
-        # Convert bytes to numpy array
-        image = Image.open(io.BytesIO(image_bytes))
-        image_np = np.array(image)
+        Decode image bytes into the BGR array PaddleOCR expects.
 
-        # Run OCR
-        result = self.ocr.ocr(image_np, cls=True)
+        EXIF orientation is ignored to keep pixel coordinates consistent
+        with the annotated image.
+
+        Args:
+            image_bytes: Image file bytes
+
+        Returns:
+            BGR image array
+        """
+        image_np = cv2.imdecode(
+            np.frombuffer(image_bytes, np.uint8),
+            cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION,
+        )
+        if image_np is None:
+            raise ValueError("Unable to decode image")
+        return image_np
+
+    def extract_text_from_array(self, image_np: np.ndarray) -> tuple[str, OCRResults]:
+        """
+        Extract text from an already decoded BGR image array.
+
+        Args:
+            image_np: BGR image array (see decode_image)
+
+        Returns:
+            Tuple of (full_text, ocr_results)
+        """
+        result = self._run_ocr(image_np)
 
         return self._process_ocr_result(result)
 
-    def extract_text_from_path(self, image_path: str) -> tuple[str, list[dict]]:
+    def extract_text_from_path(self, image_path: str) -> tuple[str, OCRResults]:
         """
         Extract text from image file path with bounding box information.
 
+        Preferred for images already on disk: PaddleOCR reads the file
+        itself. Uploads are kept in memory and go through extract_text
+        instead; spooling them to a temporary file would only add I/O.
+
         Args:
             image_path: Path to image file
 
         Returns:
             Tuple of (full_text, ocr_results)
             - full_text: All detected text concatenated
-            - ocr_results: List of dicts with 'text', 'confidence', 'bbox' keys
+            - ocr_results: OCRResults with text, confidence, bbox per line
         """
         # Run OCR directly on file path (more efficient)
-        result = self.ocr.ocr(image_path, cls=True)
+        result = self._run_ocr(image_path)
 
         return self._process_ocr_result(result)
 
-    def find_text_bbox(
-        self, ocr_results: list[dict], search_text: str
+    @staticmethod
+    def _index_results(ocr_results: OCRResults) -> dict[str, int]:
+        """
+        Index OCR lines by normalized text for exact lookups.
+
+        Args:
+            ocr_results: OCR results with bounding boxes
+
+        Returns:
+            Dict of lowered text -> row index of its first occurrence
+        """
+        exact = {}
+        for index, text in enumerate(ocr_results.texts_lower):
+            exact.setdefault(text, index)
+        return exact
+
+    @staticmethod
+    def _find_bbox(
+        ocr_results: OCRResults, exact: dict[str, int], search_text: str
     ) -> dict | None:
         """
-        Find bounding box for a specific text in OCR results.
+        Find bounding box for a text using the pre-normalized OCR texts.
 
         Args:
             ocr_results: OCR results with bounding boxes
+            exact: Exact-match index, see _index_results
             search_text: Text to search for
 
         Returns:
@@ -121,31 +252,139 @@ class OCRService:
         search_lower = search_text.lower().strip()
 
         # First try exact match
-        for result in ocr_results:
-            if result["text"].lower().strip() == search_lower:
-                return result["bbox"]
+        index = exact.get(search_lower)
+        if index is not None:
+            return ocr_results.bbox(index)
 
         # Try partial match - but require significant overlap
-        for result in ocr_results:
-            result_lower = result["text"].lower().strip()
+        for index, result_lower in enumerate(ocr_results.texts_lower):
             # OCR text must cover at least 35% of search text (or vice versa)
             if result_lower in search_lower and len(result_lower) >= len(search_lower) * 0.35:
-                return result["bbox"]
+                return ocr_results.bbox(index)
             if search_lower in result_lower and len(search_lower) >= len(result_lower) * 0.35:
-                return result["bbox"]
+                return ocr_results.bbox(index)
 
         # No confident match - skip annotation
         return None
 
+    def find_text_bbox(
+        self, ocr_results: OCRResults, search_text: str
+    ) -> dict | None:
+        """
+        Find bounding box for a specific text in OCR results.
+
+        Args:
+            ocr_results: OCR results with bounding boxes
+            search_text: Text to search for
+
+        Returns:
+            Bounding box dict or None if not found
+        """
+        if not search_text:
+            return None
+
+        return self._find_bbox(ocr_results, self._index_results(ocr_results), search_text)
+
     def find_field_bboxes(
-        self, ocr_results: list[dict], extracted_data: dict
+        self, ocr_results: OCRResults, extracted_data: dict
     ) -> dict:
-        bboxes = {}
+        """
+        Find bounding boxes for all extracted fields in OCR results.
+
+        Args:
+            ocr_results: OCR results with bounding boxes
+            extracted_data: Dict with brand, type, abv, volume values
 
-        for field in ["brand", "type", "abv", "volume"]:
-            value = extracted_data.get(field)
-            bbox = self.find_text_bbox(ocr_results, value)
-            bboxes[field] = bbox
+        Returns:
+            Dict mapping field name to bounding box dict or None
+        """
+        # Index the normalized OCR texts once for all fields
+        exact = self._index_results(ocr_results)
+
+        return {
+            field: self._find_bbox(ocr_results, exact, extracted_data.get(field))
+            for field in ["brand", "type", "abv", "volume"]
+        }
+
+
+class OCRScheduler:
+    """Funnels OCR requests through a queue drained by a single worker.
 
-        return bboxes
+    The PaddleOCR predictor is not thread-safe, so all OCR runs on one
+    worker, one image at a time in arrival order; each request gets its
+    result as soon as its own image is done. Images are decoded in the
+    submitting request's own thread so decoding overlaps with OCR.
+    """
 
+    def __init__(self, ocr_service: OCRService):
+        """
+        Initialize the scheduler.
+
+        Args:
+            ocr_service: Service that runs the OCR
+        """
+        self._ocr_service = ocr_service
+        self._queue = None
+        self._worker = None
+        # Futures of submitted images that have no result yet
+        self._pending = set()
+
+    def start(self) -> None:
+        """Start the worker task on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the worker task and fail every request still waiting on it."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        # Queued and in-flight jobs would otherwise hang
+        for future in list(self._pending):
+            if not future.done():
+                future.set_exception(RuntimeError("OCRScheduler stopped"))
+        self._pending.clear()
+
+    async def submit(self, image_bytes: bytes) -> tuple[str, OCRResults]:
+        """
+        Queue an image for OCR and wait for its result.
+
+        Args:
+            image_bytes: Image file bytes
+
+        Returns:
+            Tuple of (full_text, ocr_results)
+        """
+        if self._worker is None:
+            raise RuntimeError("OCRScheduler is not started")
+        image_np = await asyncio.to_thread(self._ocr_service.decode_image, image_bytes)
+        if self._worker is None:
+            raise RuntimeError("OCRScheduler stopped")
+        future = asyncio.get_running_loop().create_future()
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        await self._queue.put((image_np, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Worker loop: run OCR for each queued image and resolve its future."""
+        while True:
+            image_np, future = await self._queue.get()
+            if future.done():
+                continue
+            try:
+                result = await asyncio.to_thread(
+                    self._ocr_service.extract_text_from_array, image_np
+                )
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,16 @@
+"""Shared helper utilities."""
+
+from blake3 import blake3
+
+
+def content_digest(data: bytes) -> str:
+    """
+    Compute a content hash of raw bytes for use as a cache key.
+
+    Args:
+        data: Bytes to hash (e.g. uploaded image file)
+
+    Returns:
+        Hex digest string (128-bit BLAKE3)
+    """
+    return blake3(data).digest(length=16).hex()
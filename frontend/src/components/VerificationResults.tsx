@@ -1,6 +1,7 @@
 "use client";
 
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
+import { getAssetUrl } from "@/lib/api";
 import { LabelVerificationResponse } from "@/types";
 import { ComparisonCard } from "./ComparisonCard";
 
@@ -45,9 +46,9 @@ export function VerificationResults({ response }: VerificationResultsProps) {
             <CardTitle className="text-base">Annotated Image</CardTitle>
           </CardHeader>
           <CardContent>
-            {imageResult?.annotated_image_base64 ? (
+            {imageResult?.annotated_image_url ? (
               <img
-                src={imageResult.annotated_image_base64}
+                src={getAssetUrl(imageResult.annotated_image_url)}
                 alt="Annotated label"
                 className="annotated-image rounded-md border"
               />
@@ -2,6 +2,10 @@ import { LabelVerificationResponse, FormData } from "@/types";
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
+export function getAssetUrl(path: string): string {
+  return `${API_BASE_URL}${path}`;
+}
+
 export async function verifyLabel(
   images: File[],
   formData: FormData
@@ -28,7 +28,7 @@ export interface ImageResult {
   ocr_raw_text: string;
   extracted_data: ExtractedData;
   bounding_boxes: BoundingBoxes;
-  annotated_image_base64: string;
+  annotated_image_url: string;
 }
 
 export interface FieldComparison {